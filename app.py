@@ -1,9 +1,18 @@
-from fastapi import FastAPI, HTTPException, BackgroundTasks
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from pydantic import BaseModel
 from INFO import DatabaseManager, WebScraper
 from URL import LinkedInScraper
-import time
-import threading
+from WRITER import BatchWriter
+from POOL import ScraperPool
+from PACING import Pacer
+from DRIVERS import DriverPool
+from JOBS import Job, JobConflict, JobManager
+from FRONTIER import URLFrontier, FacetPlanner, ensure_unique_url
+from METRICS import metrics
+from EXPORT import FORMATS, export_chunks, watermark
+import psycopg2
+import psycopg2.errors
 from fastapi.middleware.cors import CORSMiddleware
 
 app = FastAPI()
@@ -20,6 +29,40 @@ app.add_middleware(
 def home():
     return {"message": "API de Scraping en ejecución."}
 
+# Configuración de la base de datos compartida por todos los procesos
+db_config = {
+    'dbname': 'prueba',
+    'user': 'postgres',
+    'password': '1234',
+    'host': 'localhost',
+    'port': '5432'
+}
+
+# Escritor por lotes compartido (pool de conexiones + buffer por tabla)
+writer = BatchWriter(db_config)
+
+# Pool de navegadores precalentados con sesiones de LinkedIn reutilizables
+driver_pool = DriverPool(size=2)
+
+@app.on_event("startup")
+def startup_drivers():
+    driver_pool.start()
+
+@app.on_event("shutdown")
+def shutdown_writer():
+    writer.close()
+    driver_pool.shutdown()
+
+# Métricas del escritor para dimensionar los lotes
+@app.get("/writer-stats")
+def writer_stats():
+    return writer.stats()
+
+# Métricas en formato Prometheus (histogramas por etapa y trabajo, contadores)
+@app.get("/metrics", response_class=PlainTextResponse)
+def prometheus_metrics():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
 # Modelo para scraping de URLs
 class ScraperRequest(BaseModel):
     email: str
@@ -29,29 +72,42 @@ class ScraperRequest(BaseModel):
     industries: list[str]
     company_sizes: list[str]
     pages_per_size: int
+    workers: int = 1  # Sesiones de Chrome en paralelo
+    min_interval: float = 0.5  # Retraso mínimo entre páginas por sesión (se adapta a la respuesta)
+    job_id: str | None = None  # ID de un trabajo anterior para reanudarlo
+
+# Gestor de trabajos: cada proceso tiene su ID, su token de cancelación y su checkpoint
+jobs = JobManager(writer=writer, max_jobs=2, max_workers=4)
 
-# Mecanismo de cancelación usando threading.Event
-cancel_event = threading.Event()
+@app.get("/jobs")
+def list_jobs():
+    return [jobs.status(job) for job in jobs.jobs.values()]
 
-# Endpoint para cancelar el proceso
+@app.get("/jobs/{job_id}")
+def job_status(job_id: str):
+    job = jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Trabajo no encontrado.")
+    return jobs.status(job)
+
+@app.post("/jobs/{job_id}/cancel")
+def cancel_job(job_id: str):
+    if not jobs.cancel(job_id):
+        raise HTTPException(status_code=404, detail="Trabajo no encontrado.")
+    return {"message": f"El trabajo {job_id} se ha cancelado."}
+
+# Endpoint para cancelar todos los procesos
 @app.post("/cancel-process")
 def cancel_scrape():
-    cancel_event.set()
+    jobs.cancel_all()
+    writer.flush()
     return {"message": "El proceso de scraping se ha cancelado."}
 
-# Función que realiza el proceso de scraping
-def scraping_thread(request: ScraperRequest):
-    # Reiniciar la señal de cancelación antes de iniciar
-    cancel_event.clear()
-
-    db_config = {
-        'dbname': 'prueba',
-        'user': 'postgres',
-        'password': '1234',
-        'host': 'localhost',
-        'port': '5432'
-    }
+# Caché de resultados por combinación de facetas, compartida entre ejecuciones
+facet_planner = FacetPlanner("facet_counts.json")
 
+# Función que realiza el proceso de scraping
+def scraping_thread(job: Job, request: ScraperRequest):
     linkedin_credentials = {
         'email': request.email,
         'password': request.password
@@ -59,64 +115,90 @@ def scraping_thread(request: ScraperRequest):
 
     pages_per_size = request.pages_per_size
     tabla = request.tabla
-    locations = request.location  
-    industries = request.industries
-    company_sizes = request.company_sizes
 
-    scraper = LinkedInScraper(db_config, linkedin_credentials, "locations.json", pages_per_size)
-    scraper.init_driver()
+    # Frontera compartida por los workers del trabajo, sembrada con lo que ya hay en la tabla
+    ensure_unique_url(db_config, tabla)
+    frontier = URLFrontier()
+    frontier.seed_from_table(db_config, tabla)
+
+    # Cada worker toma un navegador autenticado del pool
+    def create_session(index):
+        driver = driver_pool.acquire(request.email, request.password)
+        if driver is None:
+            print(f"🚫 Login fallido en LinkedIn (worker {index}).")
+            return None
+        return LinkedInScraper(db_config, linkedin_credentials, "locations.json", pages_per_size, writer=writer,
+                               pacer=Pacer(min_delay=request.min_interval), driver=driver, drivers=driver_pool, job_id=job.id, frontier=frontier)
 
+    # Procesa una página (ubicación, industria, tamaño, página) y encola la siguiente
+    def scrape_item(scraper, item, pool):
+        loc, industry, size, page = item
+        url = scraper.build_search_url(loc, industry, size, page)
+        print(f"🔍 [{job.id}] Scraping con URL: {url}")
+        found, new = scraper.scrape_page(url, industry, size, loc, tabla, page)
+        job.incr("pages_done")
+        job.incr("urls_found", new)
+
+        if not found and not scraper.last_page_empty:
+            # Timeout, error o throttling: no se sabe si la faceta está vacía, así que
+            # la caché y el checkpoint no cambian y la página se reintenta al reanudar
+            job.incr("errors")
+            jobs.save(job)
+            return
+
+        # El total de resultados de la primera página fija cuántas páginas pedir
+        if page == 1:
+            facet_planner.record_results(tabla, loc, industry, size, scraper.result_count() if found else 0)
+        planned = facet_planner.planned_pages(tabla, loc, industry, size)
+        exhausted = not found or (planned is not None and page >= planned)
+        facet_planner.record_page(tabla, loc, industry, size, page, exhausted)
+
+        more = not exhausted and (pages_per_size is None or page < pages_per_size)
+        job.mark_page(loc, industry, size, page, exhausted=not more)
+        jobs.save(job)
+        if not more:
+            facet_planner.save()
+        if more:
+            pool.submit((loc, industry, size, page + 1))
+
+    # Reanudar cada faceta desde la última página terminada
+    pool = ScraperPool(create_session, job.max_workers, job.cancel_event)
+    for loc in request.location:
+        for industry in request.industries:
+            for size in request.company_sizes:
+                if facet_planner.skip(tabla, loc, industry, size):
+                    print(f"⏭️ Faceta {loc}/{industry}/{size} vacía o agotada según la caché, se omite.")
+                    continue
+                item = job.resume_item(loc, industry, size)
+                if item is not None:
+                    pool.submit(item)
+
+    print(f"\n🌍 [{job.id}] Scraping con {pool.workers} sesiones, guardando en tabla: {tabla}\n")
     try:
-        if scraper.login():
-            for loc in locations:
-                if cancel_event.is_set():
-                    print("⚠️ Cancelado antes de procesar la ubicación.")
-                    return
-                
-                print(f"\n🌍 Scraping en ubicación {loc}, guardando en tabla: {tabla}\n")
-                for industry in industries:
-                    if cancel_event.is_set():
-                        print("⚠️ Cancelado antes de procesar la industria.")
-                        return
-                    for size in company_sizes:
-                        if cancel_event.is_set():
-                            print("⚠️ Cancelado antes de procesar el tamaño de empresa.")
-                            return
-
-                        base_url = (
-                            "https://www.linkedin.com/search/results/companies/"
-                            f"?companyHqGeo=%5B%22{loc}%22%5D"
-                            f"&industryCompanyVertical=%5B%22{industry}%22%5D"
-                            f"&companySize=%5B%22{size}%22%5D"
-                            "&keywords=a&origin=FACETED_SEARCH&page=1"
-                        )
-
-                        print(f"🔍 Scraping con URL: {base_url}")
-
-                        # **PASO CRÍTICO: Verificar cancelación dentro del scraping**
-                        scraper.scrape_companies(base_url, industry, size, loc, tabla)
-                        
-                        if cancel_event.is_set():
-                            print("⚠️ Cancelado mientras se ejecutaba `scrape_companies`.")
-                            return
-
-                        time.sleep(0.5)
-        else:
-            print("🚫 Login fallido en LinkedIn.")
+        pool.run(scrape_item)
     finally:
-        print("🛑 Cerrando el WebDriver...")
-        scraper.close_driver()
+        facet_planner.save()
+    print(f"🧭 [{job.id}] {len(frontier)} URLs únicas, {frontier.duplicates} duplicadas descartadas.")
+    if job.cancel_event.is_set():
+        print(f"⚠️ [{job.id}] Proceso de scraping cancelado.")
 
 
 # Endpoint que inicia el scraping en un hilo en segundo plano
 @app.post("/url")
-async def run_scraper(request: ScraperRequest, background_tasks: BackgroundTasks):
-    background_tasks.add_task(scraping_thread, request)
-    return {"message": "Proceso de scraping iniciado en segundo plano."}
+async def run_scraper(request: ScraperRequest):
+    params = request.dict(exclude={"password"})
+    try:
+        job = jobs.create("url", params, request.workers, request.job_id)
+    except JobConflict as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    jobs.start(job, scraping_thread, request)
+    return {"message": "Proceso de scraping iniciado en segundo plano.", "job_id": job.id}
 
 
 # Configuración de la base de datos para el scraping de información (asumiendo implementación)
-db = DatabaseManager("prueba", "postgres", "1234", "localhost", "5432")
+db = DatabaseManager("prueba", "postgres", "1234", "localhost", "5432", writer=writer)
 
 # Modelo para scraping de información
 class ScrapeinfoRequest(BaseModel):
@@ -124,40 +206,84 @@ class ScrapeinfoRequest(BaseModel):
     password: str
     tabla_origen: str
     tabla_destino: str
+    workers: int = 1  # Sesiones de Chrome en paralelo
+    min_interval: float = 1.0  # Retraso mínimo entre páginas por sesión (se adapta a la respuesta)
+    job_id: str | None = None  # ID de un trabajo anterior para reanudarlo
 
-def scraping_info_thread(request: ScrapeinfoRequest):
-    # Reiniciamos la bandera
-    cancel_event.clear()
+def scraping_info_thread(job: Job, request: ScrapeinfoRequest):
+    # Cada worker toma un navegador autenticado del pool
+    def create_session(index):
+        driver = driver_pool.acquire(request.email, request.password)
+        if driver is None:
+            print(f"🚫 Login fallido en LinkedIn (worker {index}).")
+            return None
+        return WebScraper(pacer=Pacer(min_delay=request.min_interval), driver=driver, drivers=driver_pool, job_id=job.id)
 
-    try:
-        scraper = WebScraper()
-        scraper.login(request.email, request.password)
+    def scrape_item(scraper, item, pool):
+        url, ciudad = item
+        data = scraper.scrape(url)
+        job.incr("pages_done")
+        # Sin nombre la página no cargó bien (authwall, error...): no se guarda, así
+        # que la URL vuelve a intentarse al reanudar
+        if data.get("Nombre de la empresa"):
+            db.insert_data(data, request.tabla_destino, ciudad, job_id=job.id, url=url)
+            job.incr("urls_found")
+        else:
+            job.incr("errors")
+        jobs.save(job)
 
-        urls = db.get_urls(request.tabla_origen)
-        if not urls:
-            print("No URLs found in the source table")
-            return
+    # Las URLs llegan por páginas cortas ordenadas por URL; las ya guardadas en
+    # el destino se omiten en SQL, así que reanudar no repite empresas
+    db.prepare_tables(request.tabla_origen, request.tabla_destino)
+    urls = db.iter_urls(request.tabla_origen, request.tabla_destino)
 
-        scraped_data = []
-        for url, ciudad in urls:
-            if cancel_event.is_set():
-                print("Proceso de scraping de información cancelado.")
-                return
-            data = scraper.scrape(url)
-            if data:
-                db.insert_data(data, request.tabla_destino, ciudad)
-                scraped_data.append(data)
-            time.sleep(1)
-        print("Scraping de información completado:", scraped_data)
-    except Exception as e:
-        print("Error:", e)
-    finally:
-        cancel_event.clear()
+    pool = ScraperPool(create_session, job.max_workers, job.cancel_event)
+    pool.run(scrape_item, source=urls)
+
+    if job.cancel_event.is_set():
+        print(f"[{job.id}] Proceso de scraping de información cancelado.")
+        return
+    print(f"[{job.id}] Scraping de información completado:", jobs.status(job))
 
 @app.post("/scrape")
-async def scrape_data(request: ScrapeinfoRequest, background_tasks: BackgroundTasks):
-    background_tasks.add_task(scraping_info_thread, request)
-    return {"message": "Proceso de scraping de información iniciado en segundo plano."}
+async def scrape_data(request: ScrapeinfoRequest):
+    params = request.dict(exclude={"password"})
+    try:
+        # Dos trabajos sobre el mismo destino leerían y guardarían las mismas empresas
+        job = jobs.create("scrape", params, request.workers, request.job_id, destination=request.tabla_destino)
+    except JobConflict as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    jobs.start(job, scraping_info_thread, request)
+    return {"message": "Proceso de scraping de información iniciado en segundo plano.", "job_id": job.id}
+
+# Exportación en streaming por bloques; `since_id` permite traer solo filas nuevas
+@app.get("/export/{tabla}")
+def export_table(tabla: str, format: str = "csv", since_id: int = 0, chunk_size: int = 5000):
+    if format not in FORMATS:
+        raise HTTPException(status_code=400, detail=f"Formato no soportado. Usa uno de: {', '.join(FORMATS)}.")
+    if format == "parquet":
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            raise HTTPException(status_code=400, detail="El formato parquet requiere pyarrow instalado.")
+    try:
+        # Se fija el id final antes de empezar para que la marca de agua sea exacta
+        until_id = watermark(db_config, tabla, since_id)
+    except psycopg2.errors.UndefinedTable:
+        raise HTTPException(status_code=404, detail=f"La tabla {tabla} no existe.")
+    except psycopg2.Error as e:
+        raise HTTPException(status_code=503, detail=f"No se pudo leer la tabla {tabla}: {e}")
+
+    return StreamingResponse(
+        export_chunks(db_config, tabla, format, since_id, until_id, chunk_size),
+        media_type=FORMATS[format],
+        headers={
+            "Content-Disposition": f'attachment; filename="{tabla}_{since_id}_{until_id}.{format}"',
+            "X-Export-Watermark": str(until_id),
+        },
+    )
 
 if __name__ == "__main__":
     import uvicorn
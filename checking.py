@@ -13,15 +13,15 @@ conn = psycopg2.connect(
 # Crear un cursor para ejecutar la consulta
 cursor = conn.cursor()
 
-# Ejecutar la consulta SQL
-query = "SELECT * from empresas_noprimary"
+# Solo las últimas 10 filas: el índice sobre id evita recorrer la tabla completa
+query = "SELECT * FROM empresas_noprimary ORDER BY id DESC LIMIT 10"
 cursor.execute(query)
 
 # Obtener los nombres de las columnas
 colnames = [desc[0] for desc in cursor.description]
 
-# Convertir los resultados en un DataFrame de Pandas
-df = pd.DataFrame(cursor.fetchall(), columns=colnames)
+# Convertir los resultados en un DataFrame de Pandas (en orden ascendente de id)
+df = pd.DataFrame(cursor.fetchall()[::-1], columns=colnames)
 
 # Cerrar la conexión
 cursor.close()
@@ -0,0 +1,29 @@
+import importlib.abc
+import importlib.machinery
+import importlib.util
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+# Los módulos del repo usan extensión .PY (INFO.PY, URL.PY...); en sistemas de
+# archivos sensibles a mayúsculas Python no los encuentra sin este buscador.
+class _UpperPyFinder(importlib.abc.MetaPathFinder):
+    def find_spec(self, name, path, target=None):
+        if "." in name:
+            return None
+        candidate = os.path.join(ROOT, f"{name}.PY")
+        if os.path.exists(candidate):
+            loader = importlib.machinery.SourceFileLoader(name, candidate)
+            return importlib.util.spec_from_file_location(name, candidate, loader=loader)
+        return None
+
+
+sys.path.insert(0, ROOT)
+sys.meta_path.append(_UpperPyFinder())
+
+# No escribir metrics.jsonl durante las pruebas
+from METRICS import metrics  # noqa: E402
+
+metrics.log.disabled = True
@@ -0,0 +1,85 @@
+import csv
+import io
+import json
+
+import pytest
+
+import EXPORT
+from EXPORT import _csv_chunks, _jsonl_chunks, _parquet_chunks
+
+# (nombre, type_code) como en cur.description: int4, text, text[]
+DESCRIPTION = (("id", 23), ("nombre", 25), ("sector", 1009))
+CHUNKS = [
+    (DESCRIPTION, [(1, "Acme", ["Manufactura", "Autopartes"]), (2, None, [])]),
+    (DESCRIPTION, [(3, "Beta, S.A.", None)]),
+]
+
+
+def test_csv_writes_header_once_and_arrays_as_json():
+    parts = list(_csv_chunks(iter(CHUNKS)))
+    assert len(parts) == 2
+    rows = list(csv.reader(io.StringIO(b"".join(parts).decode("utf-8"))))
+    assert rows == [
+        ["id", "nombre", "sector"],
+        ["1", "Acme", '["Manufactura", "Autopartes"]'],
+        ["2", "", "[]"],
+        ["3", "Beta, S.A.", ""],
+    ]
+
+
+def test_jsonl_one_object_per_row():
+    parts = list(_jsonl_chunks(iter(CHUNKS)))
+    lines = b"".join(parts).decode("utf-8").splitlines()
+    assert [json.loads(line) for line in lines] == [
+        {"id": 1, "nombre": "Acme", "sector": ["Manufactura", "Autopartes"]},
+        {"id": 2, "nombre": None, "sector": []},
+        {"id": 3, "nombre": "Beta, S.A.", "sector": None},
+    ]
+
+
+def test_parquet_row_group_per_chunk_with_footer():
+    pq = pytest.importorskip("pyarrow.parquet")
+    parts = list(_parquet_chunks(iter(CHUNKS)))
+    # Un bloque por row group más el pie del archivo
+    assert len(parts) == 3
+    table = pq.read_table(io.BytesIO(b"".join(parts)))
+    assert table.schema.field("id").type == "int64"
+    assert table.to_pylist() == [
+        {"id": 1, "nombre": "Acme", "sector": ["Manufactura", "Autopartes"]},
+        {"id": 2, "nombre": None, "sector": []},
+        {"id": 3, "nombre": "Beta, S.A.", "sector": None},
+    ]
+    assert pq.ParquetFile(io.BytesIO(b"".join(parts))).num_row_groups == 2
+
+
+def test_empty_export_yields_nothing():
+    assert list(_csv_chunks(iter([]))) == []
+    assert list(_parquet_chunks(iter([]))) == []
+
+
+def test_watermark_takes_the_write_lock_before_reading_max(monkeypatch):
+    executed = []
+
+    class Cursor:
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            return False
+
+        def execute(self, query, params):
+            executed.append((query if isinstance(query, str) else "max", params))
+
+        def fetchone(self):
+            return (42,)
+
+    class Connection:
+        def cursor(self):
+            return Cursor()
+
+        def close(self):
+            pass
+
+    monkeypatch.setattr(EXPORT.psycopg2, "connect", lambda **config: Connection())
+    assert EXPORT.watermark({}, "empresas", since_id=10) == 42
+    assert executed == [(EXPORT.WATERMARK_LOCK, ("empresas",)), ("max", (10, 10))]
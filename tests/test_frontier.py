@@ -0,0 +1,36 @@
+from FRONTIER import FacetPlanner, dedupe_plan
+
+
+def test_facet_cache_is_per_table(tmp_path):
+    planner = FacetPlanner(str(tmp_path / "facets.json"))
+    planner.record_results("url_a", "104969186", "4", "C", 0)
+    planner.record_page("url_a", "104969186", "4", "C", 1, True)
+    planner.save()
+
+    planner = FacetPlanner(str(tmp_path / "facets.json"))
+    assert planner.skip("url_a", "104969186", "4", "C")
+    assert not planner.skip("url_b", "104969186", "4", "C")
+
+
+def test_planned_pages_from_result_count(tmp_path):
+    planner = FacetPlanner(str(tmp_path / "facets.json"), per_page=10, max_pages=100)
+    assert planner.planned_pages("url_a", "1", "4", "C") is None
+    planner.record_results("url_a", "1", "4", "C", 15)
+    assert planner.planned_pages("url_a", "1", "4", "C") == 2
+    planner.record_results("url_a", "1", "4", "C", 5000)
+    assert planner.planned_pages("url_a", "1", "4", "C") == 100
+
+
+def test_dedupe_plan_keeps_lowest_id_per_normalized_url():
+    rows = [
+        (1, "https://www.linkedin.com/company/acme/"),
+        (2, "https://www.linkedin.com/company/acme"),
+        (3, "https://mx.linkedin.com/company/Acme/about/?trk=x"),
+        (4, "https://www.linkedin.com/company/beta"),
+        (5, None),
+        (6, "https://example.com/otra"),
+        (7, "https://example.com/otra"),
+    ]
+    updates, deletes = dedupe_plan(rows)
+    assert updates == [("https://www.linkedin.com/company/acme", 1)]
+    assert deletes == [2, 3, 7]
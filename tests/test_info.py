@@ -0,0 +1,50 @@
+from INFO import DatabaseManager
+
+
+class FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, query, params):
+        last_key, limit = params
+        self.conn.queries.append(last_key)
+        keys = sorted(key for key in self.conn.keys if key > last_key)[:limit]
+        self.rows = [(key, key + "/about/", "Aguascalientes") for key in keys]
+
+    def fetchall(self):
+        return self.rows
+
+
+class FakeConnection:
+    def __init__(self, keys):
+        self.keys = keys
+        self.queries = []
+        self.autocommit = False
+        self.closed = False
+
+    def cursor(self):
+        assert self.autocommit, "cada página debe ir en su propia transacción corta"
+        return FakeCursor(self)
+
+    def close(self):
+        self.closed = True
+
+
+def test_iter_urls_pages_by_url_key():
+    keys = [f"https://www.linkedin.com/company/acme-{i:02d}" for i in range(5)]
+    conn = FakeConnection(keys)
+    db = DatabaseManager("prueba", "postgres", "1234", "localhost", "5432", writer=object())
+    db.connect = lambda: conn
+
+    urls = [url for url, _ in db.iter_urls("url_t", "empresas_t", page_size=2)]
+
+    assert urls == [key + "/about/" for key in keys]
+    # Páginas de 2: cada consulta parte de la última clave de la anterior
+    assert conn.queries == ["", keys[1], keys[3]]
+    assert conn.closed
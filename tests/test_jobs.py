@@ -0,0 +1,82 @@
+import json
+import os
+import threading
+
+import pytest
+
+from JOBS import JobConflict, JobManager
+
+
+class FlakyWriter:
+    def __init__(self):
+        self.ok = True
+        self.written_by_tag = {}
+
+    def flush(self, key=None):
+        return self.ok
+
+
+def test_start_returns_while_job_waits_for_a_slot(tmp_path):
+    jobs = JobManager(max_jobs=1, checkpoint_dir=str(tmp_path))
+    release = threading.Event()
+    first, second = jobs.create("url", {}), jobs.create("url", {})
+
+    running = threading.Event()
+    jobs.start(first, lambda job: running.set() or release.wait(5))
+    assert running.wait(5)
+    thread = jobs.start(second, lambda job: None)
+    # El segundo trabajo espera su hueco en su propio hilo, no en el del llamador
+    assert second.status == "queued"
+    release.set()
+    thread.join(5)
+    assert first.status == second.status == "done"
+
+
+def test_checkpoint_is_kept_when_flush_fails(tmp_path):
+    writer = FlakyWriter()
+    jobs = JobManager(writer, checkpoint_dir=str(tmp_path))
+    job = jobs.create("url", {})
+    job.mark_page("1", "4", "C", 1, False)
+    assert jobs.save(job, force=True)
+
+    writer.ok = False
+    job.mark_page("1", "4", "C", 2, False)
+    assert not jobs.save(job, force=True)
+    with open(os.path.join(str(tmp_path), f"{job.id}.json"), encoding="utf-8") as file:
+        assert json.load(file)["state"]["facets"]["1|4|C"]["page"] == 1
+
+
+def test_job_id_must_match_generated_format(tmp_path):
+    jobs = JobManager(checkpoint_dir=str(tmp_path / "jobs"))
+    for job_id in ("../escaped", "ABCDEF012345", "0123456789ab/..", ""):
+        with pytest.raises(ValueError):
+            jobs.create("url", {}, job_id=job_id)
+    assert not (tmp_path / "escaped.json").exists()
+
+
+def test_checkpoint_is_resumed_only_by_the_same_kind(tmp_path):
+    jobs = JobManager(checkpoint_dir=str(tmp_path))
+    job = jobs.create("scrape", {})
+    job.status = "done"
+
+    with pytest.raises(ValueError):
+        JobManager(checkpoint_dir=str(tmp_path)).create("url", {}, job_id=job.id)
+    assert JobManager(checkpoint_dir=str(tmp_path)).create("scrape", {}, job_id=job.id).kind == "scrape"
+
+
+def test_running_job_cannot_be_created_twice(tmp_path):
+    jobs = JobManager(checkpoint_dir=str(tmp_path))
+    job = jobs.create("url", {})
+    with pytest.raises(JobConflict):
+        jobs.create("url", {}, job_id=job.id)
+
+
+def test_one_active_job_per_destination(tmp_path):
+    jobs = JobManager(checkpoint_dir=str(tmp_path))
+    first = jobs.create("scrape", {}, destination="empresas")
+    with pytest.raises(JobConflict):
+        jobs.create("scrape", {}, destination="empresas")
+    assert jobs.create("scrape", {}, destination="otras").destination == "otras"
+
+    first.status = "done"
+    assert jobs.create("scrape", {}, destination="empresas").destination == "empresas"
@@ -0,0 +1,35 @@
+from METRICS import Metrics
+
+
+def test_render_histograms_and_counters():
+    metrics = Metrics(buckets=(0.1, 1.0), log_path=None)
+    metrics.observe("navigation", 0.05, job="job1")
+    metrics.observe("navigation", 0.5, job="job1")
+    metrics.incr("pages", job="job1")
+    metrics.incr("pages", 2, job="job1")
+    metrics.incr("retries")
+
+    lines = metrics.render().splitlines()
+    assert 'scraper_stage_seconds_bucket{stage="navigation",job="job1",le="0.1"} 1' in lines
+    assert 'scraper_stage_seconds_bucket{stage="navigation",job="job1",le="1.0"} 2' in lines
+    assert 'scraper_stage_seconds_bucket{stage="navigation",job="job1",le="+Inf"} 2' in lines
+    assert 'scraper_stage_seconds_sum{stage="navigation",job="job1"} 0.55' in lines
+    assert 'scraper_stage_seconds_count{stage="navigation",job="job1"} 2' in lines
+    assert "# TYPE scraper_pages_total counter" in lines
+    assert 'scraper_pages_total{job="job1"} 3' in lines
+    # Sin trabajo no hay etiqueta
+    assert "scraper_retries_total 1" in lines
+
+
+def test_series_of_old_jobs_are_evicted():
+    metrics = Metrics(log_path=None, max_jobs=2)
+    for job in ("job1", "job2", "job3"):
+        metrics.observe("db_write", 0.01, job=job)
+        metrics.incr("rows_written", 5, job=job)
+    metrics.incr("retries")
+
+    text = metrics.render()
+    assert 'job="job1"' not in text
+    assert 'job="job2"' in text and 'job="job3"' in text
+    # Las series sin trabajo no cuentan para el límite
+    assert "scraper_retries_total 1" in text
@@ -0,0 +1,19 @@
+from types import SimpleNamespace
+
+from PACING import is_throttled
+
+
+def page(url, title=""):
+    return SimpleNamespace(current_url=url, title=title)
+
+
+def test_429_in_url_is_not_throttling():
+    assert not is_throttled(page("https://www.linkedin.com/company/acme-1429/about/", "Acme | LinkedIn"))
+    assert not is_throttled(page("https://www.linkedin.com/search/results/companies/?companyHqGeo=%5B%22104294290%22%5D"))
+
+
+def test_throttling_markers():
+    assert is_throttled(page("https://www.linkedin.com/checkpoint/challenge/abc"))
+    assert is_throttled(page("https://www.linkedin.com/authwall?trk=x"))
+    assert is_throttled(page("https://www.linkedin.com/feed/", "HTTP Error 429"))
+    assert is_throttled(page("https://www.linkedin.com/feed/", "Too Many Requests"))
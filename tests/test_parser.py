@@ -0,0 +1,54 @@
+import os
+
+import pytest
+
+from INFO import WebScraper
+from PARSER import parse_about_page
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+def load(name):
+    with open(os.path.join(FIXTURES, name), encoding="utf-8") as file:
+        return file.read()
+
+
+@pytest.fixture
+def full():
+    return WebScraper.format_data(parse_about_page(load("about_full.html")))
+
+
+def test_top_card_without_hidden_text(full):
+    assert full["Nombre de la empresa"] == "Acme Industrial"
+    assert full["Sector"] == "Fabricación de maquinaria"
+
+
+def test_resumen_is_truncated(full):
+    assert full["Resumen"].endswith("...")
+    assert len(full["Resumen"]) == 153
+
+
+def test_dt_groups_every_following_dd(full):
+    assert full["Sitio web"] == ["https://acme.example.mx"]
+    assert full["Sede"] == ["Aguascalientes, AGS"]
+    # Dos <dd> bajo el mismo <dt>: format_data se queda con el primero
+    assert full["Tamaño de la empresa"] == "51-200 empleados"
+    assert parse_about_page(load("about_full.html"))["Tamaño de la empresa"] == ["51-200 empleados", "143 miembros asociados"]
+
+
+def test_visually_hidden_text_is_dropped(full):
+    assert full["Teléfono"] == "449 123 4567"
+    assert "verificada" not in full["Nombre de la empresa"]
+    assert not any("no visible" in str(value) for value in full.values())
+
+
+def test_locations_and_postal_code(full):
+    assert full["Ubicaciones"] == "Av. Aguascalientes 123\nAguascalientes, AGS 20000, MX, Blvd. Zacatecas 45, Jesús María, AGS 20900, MX"
+    assert full["Código Postal"] == "20000"
+
+
+def test_page_without_name():
+    data = WebScraper.format_data(parse_about_page(load("about_no_name.html")))
+    assert "Nombre de la empresa" not in data
+    assert data["Ubicaciones"] == ""
+    assert data["Código Postal"] is None
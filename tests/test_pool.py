@@ -0,0 +1,233 @@
+import json
+import os
+import threading
+import time
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+from lxml import html as lxml_html
+from selenium.common.exceptions import NoSuchElementException
+
+from DRIVERS import DriverPool
+from FRONTIER import URLFrontier
+from PACING import Pacer
+from POOL import ScraperPool
+from URL import LinkedInScraper
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PAGES_WITH_RESULTS = 2
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    # Búsqueda falsa: dos páginas con empresas por faceta y luego "sin resultados"
+    def do_GET(self):
+        parts = urlsplit(self.path)
+        if parts.path.startswith("/throttled/"):
+            # Responde con el marcador de "sin resultados", pero con título de throttling
+            body = '<html><head><title>HTTP Error 429</title></head><body><div class="search-reusables__no-results"></div></body></html>'
+        elif parts.path.startswith("/search/"):
+            query = parse_qs(parts.query)
+            loc = query["companyHqGeo"][0].strip('[]"')
+            page = int(query["page"][0])
+            if page <= PAGES_WITH_RESULTS:
+                links = "".join(
+                    # Cada empresa aparece dos veces (logo y nombre), como en LinkedIn
+                    f'<a href="https://www.linkedin.com/company/{loc}-{page}-{i}/">x</a>' * 2
+                    for i in range(3)
+                )
+                body = f"<html><body><h2>15 resultados</h2>{links}</body></html>"
+            else:
+                body = '<html><body><div class="search-reusables__no-results">Nada</div></body></html>'
+        else:
+            body = "<html><head><title>Inicio</title></head><body>ok</body></html>"
+        data = body.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+class _Element:
+    def __init__(self, node):
+        self.node = node
+
+    @property
+    def text(self):
+        return self.node.text_content().strip()
+
+    def get_attribute(self, name):
+        return self.node.get(name)
+
+
+class HttpDriver:
+    # Sustituto mínimo de WebDriver sobre urllib + lxml (solo lo que usa el scraper)
+    def __init__(self):
+        self.current_url = ""
+        self.title = ""
+        self.tree = None
+        self.cookies = []
+        self.closed = False
+
+    def get(self, url):
+        with urllib.request.urlopen(url) as response:
+            self.current_url = response.geturl()
+            self.tree = lxml_html.fromstring(response.read())
+        self.title = self.tree.findtext(".//title") or ""
+
+    def find_elements(self, by, xpath):
+        return [_Element(node) for node in self.tree.xpath(xpath)]
+
+    def find_element(self, by, xpath):
+        found = self.find_elements(by, xpath)
+        if not found:
+            raise NoSuchElementException(xpath)
+        return found[0]
+
+    def add_cookie(self, cookie):
+        self.cookies.append(cookie)
+
+    def get_cookies(self):
+        return list(self.cookies)
+
+    def quit(self):
+        self.closed = True
+
+
+class ListWriter:
+    def __init__(self):
+        self.rows = []
+        self.lock = threading.Lock()
+
+    def add(self, tabla, columns, row, tag=None, ignore_conflicts=False):
+        with self.lock:
+            self.rows.append((tabla, row))
+
+    def flush(self, key=None):
+        return True
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), FixtureHandler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+
+
+def test_pool_scrapes_facet_grid_against_fixture_server(server, tmp_path):
+    # Sesión guardada reciente: el pool la restaura sin pasar por el login
+    drivers = DriverPool(size=0, max_idle=2, sessions_dir=str(tmp_path), driver_factory=HttpDriver,
+                         login_url=f"{server}/login", home_url=f"{server}/", feed_url=f"{server}/feed/")
+    key = drivers._account_key("a@b.c")
+    with open(os.path.join(str(tmp_path), f"{key}.json"), "w", encoding="utf-8") as file:
+        json.dump({"saved": time.time(), "cookies": [{"name": "li_at", "value": "x"}]}, file)
+
+    writer = ListWriter()
+    frontier = URLFrontier()
+
+    def create_session(index):
+        driver = drivers.acquire("a@b.c", "secreto")
+        return LinkedInScraper({}, {"email": "a@b.c", "password": "secreto"}, os.path.join(ROOT, "locations.json"),
+                               pages_per_size=None, writer=writer, search_url=f"{server}/search/",
+                               pacer=Pacer(min_delay=0), driver=driver, drivers=drivers, frontier=frontier)
+
+    def scrape_item(scraper, item, pool):
+        loc, industry, size, page = item
+        found, _ = scraper.scrape_page(scraper.build_search_url(loc, industry, size, page), industry, size, loc, "url_t", page)
+        if found:
+            pool.submit((loc, industry, size, page + 1))
+        else:
+            empty.append(scraper.last_page_empty)
+
+    empty = []
+    pool = ScraperPool(create_session, workers=2)
+    for loc in ("104969186", "104326492"):
+        pool.submit((loc, "4", "C", 1))
+
+    assert pool.run(scrape_item)
+
+    urls = sorted(row[0] for _, row in writer.rows)
+    # 2 ubicaciones x 2 páginas x 3 empresas, sin los enlaces duplicados
+    assert len(urls) == 12
+    assert len(set(urls)) == 12
+    assert "https://www.linkedin.com/company/104969186-1-0" in urls
+    assert {row[1] for _, row in writer.rows} == {"Aguascalientes", "Jesus Maria"}
+    # Cada faceta termina en una página con el marcador de "sin resultados"
+    assert empty == [True, True]
+    # Los navegadores vuelven al pool al terminar
+    assert sum(len(items) for items in drivers._idle.values()) == 2
+
+
+def test_driver_pool_caps_idle_and_quits_broken_drivers(tmp_path):
+    drivers = DriverPool(size=0, max_idle=1, sessions_dir=str(tmp_path), driver_factory=HttpDriver,
+                         home_url="http://127.0.0.1:9/")
+    key = drivers._account_key("a@b.c")
+    with open(os.path.join(str(tmp_path), f"{key}.json"), "w", encoding="utf-8") as file:
+        json.dump({"saved": time.time(), "cookies": []}, file)
+
+    # Sin servidor en el puerto 9: driver.get falla al cargar las cookies
+    created = []
+    drivers.driver_factory = lambda: created.append(HttpDriver()) or created[-1]
+    assert drivers.acquire("a@b.c", "secreto") is None
+    assert created[0].closed
+
+    # Solo se conserva `max_idle` navegadores ociosos por cuenta
+    first, second = HttpDriver(), HttpDriver()
+    drivers._owner[first] = drivers._owner[second] = key
+    drivers.release(first)
+    drivers.release(second)
+    assert [driver for driver, _ in drivers._idle[key]] == [first]
+    assert second.closed and not first.closed
+
+
+def test_throttled_page_is_not_reported_empty(server):
+    scraper = LinkedInScraper({}, {"email": "a@b.c", "password": "secreto"}, os.path.join(ROOT, "locations.json"),
+                              writer=ListWriter(), pacer=Pacer(min_delay=0), driver=HttpDriver())
+    assert scraper.scrape_page(f"{server}/throttled/", "4", "C", "104969186", "url_t") == (0, 0)
+    assert not scraper.last_page_empty
+
+
+def test_release_discards_session_that_hit_authwall(server, tmp_path):
+    # El "feed" del servidor de pruebas responde con throttling: la sesión ya no sirve
+    drivers = DriverPool(size=0, max_idle=2, sessions_dir=str(tmp_path), driver_factory=HttpDriver,
+                         home_url=f"{server}/", feed_url=f"{server}/throttled/")
+    key = drivers._account_key("a@b.c")
+    driver = HttpDriver()
+    drivers._owner[driver] = key
+    drivers._save_cookies(driver, key)
+
+    # El trabajo terminó en el authwall, así que release comprueba la sesión aunque no se pida
+    driver.current_url = "https://www.linkedin.com/authwall?trk=x"
+    drivers.release(driver)
+    assert driver.closed
+    assert not drivers._idle[key]
+    assert not os.path.exists(drivers._cookies_path(key))
+
+
+def test_release_keeps_healthy_session_after_verify(server, tmp_path):
+    drivers = DriverPool(size=0, max_idle=2, sessions_dir=str(tmp_path), driver_factory=HttpDriver,
+                         home_url=f"{server}/", feed_url=f"{server}/feed/")
+    key = drivers._account_key("a@b.c")
+    driver = HttpDriver()
+    drivers._owner[driver] = key
+    drivers.release(driver, verify=True)
+    assert not driver.closed
+    assert os.path.exists(drivers._cookies_path(key))
+
+
+def test_shutdown_quits_checked_out_drivers(tmp_path):
+    drivers = DriverPool(size=0, sessions_dir=str(tmp_path), driver_factory=HttpDriver)
+    idle, busy = HttpDriver(), HttpDriver()
+    drivers._idle["k"].append((idle, time.monotonic()))
+    drivers._owner[busy] = "k"
+    drivers.shutdown()
+    assert idle.closed and busy.closed
+    # El trabajo devuelve el navegador más tarde sin error
+    drivers.release(busy)
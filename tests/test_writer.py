@@ -0,0 +1,136 @@
+import pytest
+
+import WRITER
+from WRITER import BatchWriter
+
+
+class FakeDatabase:
+    # Tabla en memoria con las restricciones que importan: varchar(50) en telefono y url única
+    def __init__(self):
+        self.rows = []
+        self.fail_next = 0  # Errores transitorios (p. ej. conexión reiniciada) antes de funcionar
+        self.break_connections = False
+
+
+class FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, query, params=None):
+        self.conn.statements.append(query)
+
+    def insert(self, rows, ignore_conflicts):
+        db = self.conn.db
+        if db.fail_next:
+            db.fail_next -= 1
+            raise RuntimeError("server closed the connection unexpectedly")
+        inserted = []
+        for row in rows:
+            if any(isinstance(value, str) and len(value) > 50 for value in row):
+                raise RuntimeError("value too long for type character varying(50)")
+            if ignore_conflicts and any(row[0] == existing[0] for existing in db.rows + inserted):
+                continue
+            inserted.append(row)
+        self.conn.pending.extend(inserted)
+        return inserted
+
+
+class FakeConnection:
+    def __init__(self, db):
+        self.db = db
+        self.closed = 0
+        self.statements = []
+        self.pending = []
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def commit(self):
+        self.db.rows.extend(self.pending)
+        self.pending = []
+
+    def rollback(self):
+        self.pending = []
+        if self.db.break_connections:
+            self.closed = 2
+            raise RuntimeError("connection already closed")
+
+
+class FakePool:
+    def __init__(self, db):
+        self.db = db
+        self.returned = []
+
+    def getconn(self):
+        return FakeConnection(self.db)
+
+    def putconn(self, conn, close=False):
+        self.returned.append(close)
+
+    def closeall(self):
+        pass
+
+
+def fake_execute_values(cur, query, rows, page_size=100, fetch=False):
+    assert page_size >= len(rows)  # Un solo INSERT por lote
+    inserted = cur.insert(rows, ignore_conflicts=fetch)
+    return inserted if fetch else None
+
+
+@pytest.fixture
+def db(monkeypatch):
+    monkeypatch.setattr(WRITER, "execute_values", fake_execute_values)
+    return FakeDatabase()
+
+
+@pytest.fixture
+def writer(db):
+    writer = BatchWriter({}, batch_size=100, flush_interval=3600)
+    writer._pool = FakePool(db)
+    yield writer
+    writer._stop.set()
+
+
+def test_batch_that_fails_once_is_retried(writer, db):
+    db.fail_next = 1
+    for i in range(3):
+        writer.add("empresas", ("nombre", "telefono"), (f"Empresa {i}", "449 123 4567"), tag="job1")
+    assert writer.flush()
+    assert [row[0] for row in db.rows] == ["Empresa 0", "Empresa 1", "Empresa 2"]
+    assert writer.rows_written == 3 and writer.rows_failed == 0
+    assert writer.written_by_tag["job1"] == 3
+
+
+def test_one_bad_row_falls_back_to_row_by_row(writer, db):
+    writer.add("empresas", ("nombre", "telefono"), ("Acme", "449 123 4567"), tag="job1")
+    writer.add("empresas", ("nombre", "telefono"), ("Beta", "4" * 60), tag="job1")
+    writer.add("empresas", ("nombre", "telefono"), ("Gama", "449 765 4321"), tag="job1")
+    assert not writer.flush()
+    assert [row[0] for row in db.rows] == ["Acme", "Gama"]
+    assert writer.rows_written == 2 and writer.rows_failed == 1
+    assert writer.stats()["rows_pending"] == 0
+
+
+def test_broken_connection_is_discarded(writer, db):
+    db.fail_next = 2
+    db.break_connections = True
+    writer.add("empresas", ("nombre", "telefono"), ("Acme", "449 123 4567"))
+    # Dos intentos de lote con rollback fallido; luego la fila sola se escribe
+    assert writer.flush()
+    assert writer._pool.returned == [True, True, False]
+    assert [row[0] for row in db.rows] == ["Acme"]
+
+
+def test_conflicts_are_not_counted_as_written(writer, db):
+    db.rows.append(("https://www.linkedin.com/company/acme", "Aguascalientes"))
+    writer.add("url_t", ("url", "city"), ("https://www.linkedin.com/company/acme", "Aguascalientes"), tag="job1", ignore_conflicts=True)
+    writer.add("url_t", ("url", "city"), ("https://www.linkedin.com/company/beta", "Aguascalientes"), tag="job1", ignore_conflicts=True)
+    assert writer.flush()
+    assert writer.rows_written == 1
+    assert writer.written_by_tag["job1"] == 1